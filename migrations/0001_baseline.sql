@@ -0,0 +1,141 @@
+-- Базовая схема. Все команды идемпотентны: миграция безопасно применяется
+-- и к пустой базе, и к базе, созданной прежним _create_tables().
+
+-- 👥 Пользователи
+CREATE TABLE IF NOT EXISTS users (
+    user_id BIGINT PRIMARY KEY,
+    username TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    balance REAL DEFAULT 0,
+    referral_code TEXT UNIQUE,
+    referrer_id BIGINT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 📬 Статус доставки: заблокировавшие бота исключаются из рассылок
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS delivery_status TEXT NOT NULL DEFAULT 'active',
+    ADD COLUMN IF NOT EXISTS status_changed_at TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS last_delivered_at TIMESTAMP;
+CREATE INDEX IF NOT EXISTS idx_users_active ON users (user_id) WHERE delivery_status = 'active';
+CREATE INDEX IF NOT EXISTS idx_users_dead ON users (status_changed_at) WHERE delivery_status <> 'active';
+
+-- 🤝 Рефералы
+CREATE TABLE IF NOT EXISTS referrals (
+    id SERIAL PRIMARY KEY,
+    referrer_id BIGINT,
+    referred_id BIGINT,
+    bonus_paid BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(referred_id)
+);
+CREATE INDEX IF NOT EXISTS idx_referrals_referrer ON referrals (referrer_id);
+
+-- 🔢 Счетчик рефералов: колонка добавляется и заполняется один раз
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'users' AND column_name = 'referral_count'
+    ) THEN
+        ALTER TABLE users ADD COLUMN referral_count INTEGER NOT NULL DEFAULT 0;
+        UPDATE users AS u SET referral_count = r.total
+        FROM (SELECT referrer_id, COUNT(*) AS total FROM referrals GROUP BY referrer_id) AS r
+        WHERE u.user_id = r.referrer_id;
+    END IF;
+END $$;
+
+-- 📂 Категории и 🎁 товары с оформлением (текст кнопок, описание, порядок показа)
+CREATE TABLE IF NOT EXISTS categories (
+    id SERIAL PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+ALTER TABLE categories
+    ADD COLUMN IF NOT EXISTS button_text TEXT,
+    ADD COLUMN IF NOT EXISTS description TEXT,
+    ADD COLUMN IF NOT EXISTS position INTEGER;
+
+CREATE TABLE IF NOT EXISTS items (
+    id SERIAL PRIMARY KEY,
+    category_id INTEGER,
+    name TEXT NOT NULL,
+    price REAL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (category_id) REFERENCES categories (id)
+);
+ALTER TABLE items
+    ADD COLUMN IF NOT EXISTS button_text TEXT,
+    ADD COLUMN IF NOT EXISTS position INTEGER;
+
+-- 🔑 Уникальность товара в категории: сначала убираем дубли старого сидирования
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'items_category_id_name_key') THEN
+        DELETE FROM items AS dup USING items AS kept
+        WHERE dup.category_id = kept.category_id AND dup.name = kept.name AND dup.id > kept.id;
+        ALTER TABLE items ADD CONSTRAINT items_category_id_name_key UNIQUE (category_id, name);
+    END IF;
+END $$;
+
+-- 🔢 Версия каталога: триггеры увеличивают ее и оповещают воркеры (канал CATALOG_CHANNEL)
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1
+);
+INSERT INTO catalog_version (id) VALUES (TRUE) ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+DECLARE
+    new_version BIGINT;
+BEGIN
+    UPDATE catalog_version SET version = version + 1 RETURNING version INTO new_version;
+    PERFORM pg_notify('catalog_changed', new_version::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS categories_catalog_version ON categories;
+CREATE TRIGGER categories_catalog_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+
+DROP TRIGGER IF EXISTS items_catalog_version ON items;
+CREATE TRIGGER items_catalog_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON items
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+
+-- 📢 Задания рассылки (чекпоинт для продолжения после рестарта)
+CREATE TABLE IF NOT EXISTS broadcast_jobs (
+    id SERIAL PRIMARY KEY,
+    job_key TEXT UNIQUE NOT NULL,
+    text TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    last_user_id BIGINT NOT NULL DEFAULT 0,
+    sent INTEGER NOT NULL DEFAULT 0,
+    blocked INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+ALTER TABLE broadcast_jobs ADD COLUMN IF NOT EXISTS fencing_token BIGINT NOT NULL DEFAULT 0;
+
+-- ⚙️ Служебные настройки (версия начальных данных и т.п.)
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+-- ⏰ Плановые задачи: расписание и результат последнего запуска
+CREATE TABLE IF NOT EXISTS scheduled_jobs (
+    name TEXT PRIMARY KEY,
+    schedule TEXT NOT NULL,
+    next_run_at TIMESTAMPTZ NOT NULL,
+    triggered_at TIMESTAMPTZ,
+    last_run_at TIMESTAMPTZ,
+    last_status TEXT,
+    last_error TEXT,
+    last_duration REAL
+);
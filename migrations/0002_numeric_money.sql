@@ -0,0 +1,3 @@
+-- 💰 Деньги в NUMERIC: REAL накапливает ошибки округления при начислении бонусов
+ALTER TABLE users ALTER COLUMN balance TYPE NUMERIC(12, 2) USING round(balance::numeric, 2);
+ALTER TABLE items ALTER COLUMN price TYPE NUMERIC(12, 2) USING round(price::numeric, 2);
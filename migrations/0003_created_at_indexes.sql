@@ -0,0 +1,4 @@
+-- no-transaction
+-- 📇 Индексы для инкрементальных резервных копий; строятся без блокировки записи
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_created_at ON users (created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_referrals_created_at ON referrals (created_at);
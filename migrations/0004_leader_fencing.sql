@@ -0,0 +1,4 @@
+-- 👑 Fencing-токены лидера выдает Postgres: счетчик в Redis (allkeys-lru, без persistence)
+-- может сброситься, и тогда задания с прежними токенами навсегда отклонялись бы
+CREATE SEQUENCE IF NOT EXISTS leader_fencing;
+SELECT setval('leader_fencing', GREATEST((SELECT MAX(fencing_token) FROM broadcast_jobs), 1));
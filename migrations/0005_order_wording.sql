@@ -0,0 +1,4 @@
+-- 🛒 Подписи в тексте заказа: order_label — категория после названия товара
+-- (NULL — название категории, пустая строка — без категории), order_title — название товара в заказе
+ALTER TABLE categories ADD COLUMN IF NOT EXISTS order_label TEXT;
+ALTER TABLE items ADD COLUMN IF NOT EXISTS order_title TEXT;
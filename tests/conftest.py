@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+# bot.py читает настройки при импорте: без Redis, метрик и реальных лимитов
+os.environ.setdefault('REDIS_URL', '')
+os.environ.setdefault('METRICS_PORT', '0')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,73 @@
+import asyncio
+import multiprocessing
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from benchmark import FakeBotAPI
+from bot import Broadcaster
+
+
+def broadcast(chat_ids, concurrency=4, max_retries=3, **api_options):
+    """Рассылка по chat_ids через фейковый Bot API: (результаты, статистика, запросы к API)"""
+    async def run():
+        api = FakeBotAPI(0, multiprocessing.Value('q', 0), **api_options)
+        base_url = await api.start()
+        bot = Bot('42:TEST', session=AiohttpSession(api=TelegramAPIServer.from_base(base_url)))
+        try:
+            broadcaster = Broadcaster(bot, rate=1000, concurrency=concurrency, max_retries=max_retries)
+
+            async def batches():
+                yield list(chat_ids)
+
+            results = []
+
+            async def on_batch(user_ids, batch_results):
+                results.extend(batch_results)
+
+            stats = await broadcaster.run(batches(), 'Привет', on_batch=on_batch)
+            return results, stats, api.requests
+        finally:
+            await bot.session.close()
+            await api.stop()
+
+    return asyncio.run(run())
+
+
+def test_blocked_and_failed_chats_are_not_retried():
+    results, stats, requests = broadcast(range(1, 11), blocked_chats={3, 7}, missing_chats={5})
+    assert results == ['sent', 'sent', 'blocked', 'sent', 'failed', 'sent', 'blocked', 'sent', 'sent', 'sent']
+    assert (stats.success, stats.blocked, stats.errors, stats.retries) == (7, 2, 1, 0)
+    # Каждому чату ровно один запрос: 403 и 400 повтором не лечатся
+    assert sorted(chat_id for _, _, chat_id, _ in requests) == list(range(1, 11))
+
+
+def test_retry_after_pauses_sending():
+    results, stats, requests = broadcast(range(1, 4), concurrency=1, flood_every=3, retry_after=1)
+    assert results == ['sent'] * 3
+    assert (stats.success, stats.blocked, stats.errors, stats.retries) == (3, 0, 0, 1)
+    statuses = [(chat_id, status) for _, _, chat_id, status in requests]
+    assert statuses == [(1, 200), (2, 200), (3, 429), (3, 200)]
+    # После 429 следующий запрос уходит не раньше, чем через retry_after
+    flooded_at, retried_at = requests[2][0], requests[3][0]
+    assert retried_at - flooded_at >= 1
+
+
+def test_retry_after_pauses_all_senders():
+    results, stats, requests = broadcast(range(1, 9), concurrency=4, flood_every=5, retry_after=1)
+    assert results == ['sent'] * 8
+    flooded = [at for at, _, _, status in requests if status == 429]
+    assert stats.retries == len(flooded) > 0
+    assert (stats.success, stats.blocked, stats.errors) == (8, 0, 0)
+    # Запросы, отправленные после получения 429, ждут паузу все вместе
+    first_flood = flooded[0]
+    later = [at for at, _, _, _ in requests if at > first_flood + 0.5]
+    assert later and min(later) - first_flood >= 1
+
+
+def test_retries_exhausted_count_as_failed():
+    results, stats, requests = broadcast([1], concurrency=1, max_retries=1, flood_every=1, retry_after=1)
+    assert results == ['failed']
+    assert (stats.success, stats.blocked, stats.errors, stats.retries) == (0, 0, 1, 2)
+    assert len(requests) == 2
@@ -0,0 +1,198 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+import bot
+from bot import CronSchedule, Scheduler
+
+MSK = pytz.timezone('Europe/Moscow')
+
+
+def msk(*args) -> datetime:
+    return MSK.localize(datetime(*args)).astimezone(pytz.utc)
+
+
+# ---------- разбор полей ----------
+
+@pytest.mark.parametrize('part, low, high, expected', [
+    ('*', 0, 5, {0, 1, 2, 3, 4, 5}),
+    ('*/15', 0, 59, {0, 15, 30, 45}),
+    ('5/20', 0, 59, {5, 25, 45}),
+    ('1-5', 0, 59, {1, 2, 3, 4, 5}),
+    ('10-20/5', 0, 59, {10, 15, 20}),
+    ('1,3,7-8', 0, 59, {1, 3, 7, 8}),
+    ('7', 0, 7, {7}),
+])
+def test_parse(part, low, high, expected):
+    assert CronSchedule._parse(part, low, high) == expected
+
+
+@pytest.mark.parametrize('expr', ['60 * * * *', '* 24 * * *', '0 0 0 * *', '5-1 * * * *', '* * * *'])
+def test_invalid_expressions(expr):
+    with pytest.raises(ValueError):
+        CronSchedule(expr)
+
+
+def test_sunday_is_zero_and_seven():
+    assert CronSchedule('0 0 * * 7').weekdays == CronSchedule('0 0 * * 0').weekdays == {0}
+
+
+# ---------- следующий и предыдущий запуск ----------
+
+def test_next_after_same_day_and_strictly_after():
+    daily = CronSchedule('0 13 * * *')
+    assert daily.next_after(msk(2024, 5, 10, 12, 59)) == msk(2024, 5, 10, 13, 0)
+    assert daily.next_after(msk(2024, 5, 10, 13, 0)) == msk(2024, 5, 11, 13, 0)
+
+
+def test_next_after_steps_and_month_rollover():
+    assert CronSchedule('0 */6 * * *').next_after(msk(2024, 5, 10, 6, 0)) == msk(2024, 5, 10, 12, 0)
+    assert CronSchedule('30 4 1 * *').next_after(msk(2024, 12, 15, 0, 0)) == msk(2025, 1, 1, 4, 30)
+
+
+def test_day_of_month_or_day_of_week():
+    # Оба поля заданы: срабатывает и 13-го числа, и в пятницу
+    schedule = CronSchedule('0 0 13 * 5')
+    assert schedule.next_after(msk(2024, 9, 1, 0, 0)) == msk(2024, 9, 6, 0, 0)    # пятница
+    assert schedule.next_after(msk(2024, 9, 10, 0, 0)) == msk(2024, 9, 13, 0, 0)  # 13-е, тоже пятница
+    assert schedule.next_after(msk(2024, 10, 11, 0, 0)) == msk(2024, 10, 13, 0, 0)  # 13-е, воскресенье
+    # Задан только день недели: день месяца не ограничивает
+    assert CronSchedule('0 9 * * 1').next_after(msk(2024, 9, 3, 0, 0)) == msk(2024, 9, 9, 9, 0)
+
+
+def test_schedule_that_never_fires():
+    with pytest.raises(ValueError):
+        CronSchedule('0 0 30 2 *').next_after(msk(2024, 1, 1, 0, 0))
+
+
+def test_last_at_or_before():
+    daily = CronSchedule('0 13 * * *')
+    assert daily.last_at_or_before(msk(2024, 5, 10, 13, 0)) == msk(2024, 5, 10, 13, 0)
+    assert daily.last_at_or_before(msk(2024, 5, 10, 12, 59)) == msk(2024, 5, 9, 13, 0)
+    assert CronSchedule('30 4 1 * *').last_at_or_before(msk(2025, 1, 1, 4, 0)) == msk(2024, 12, 1, 4, 30)
+
+
+# ---------- планировщик ----------
+
+class FakeDatabase:
+    def __init__(self, advance=True):
+        self.advance = advance
+        self.advanced = []
+        self.triggers_taken = []
+
+    async def advance_scheduled_job(self, name, due_at, next_run_at):
+        self.advanced.append((name, due_at, next_run_at))
+        return self.advance
+
+    async def take_scheduled_trigger(self, name, triggered_at):
+        self.triggers_taken.append(name)
+        return True
+
+    async def record_scheduled_run(self, *args):
+        pass
+
+
+def make_scheduler(db, **job_options):
+    started = []
+
+    async def job(scheduled_at):
+        started.append(scheduled_at)
+
+    scheduler = Scheduler(db, poll_interval=15)
+    scheduler.add('daily', job, '0 13 * * *', **job_options)
+    return scheduler, scheduler.jobs['daily'], started
+
+
+def process(scheduler, job, row, now):
+    async def run():
+        result = await scheduler._process(job, row, now)
+        await asyncio.gather(*scheduler._tasks)
+        return result
+    return asyncio.run(run())
+
+
+def row(next_run_at, triggered_at=None):
+    return {'next_run_at': next_run_at, 'triggered_at': triggered_at}
+
+
+def test_not_due_yet():
+    db = FakeDatabase()
+    scheduler, job, started = make_scheduler(db)
+    nominal = msk(2024, 5, 10, 13, 0)
+    assert process(scheduler, job, row(nominal), nominal - timedelta(minutes=1)) == nominal
+    assert started == [] and db.advanced == []
+
+
+def test_due_run_starts_once_and_advances():
+    db = FakeDatabase()
+    scheduler, job, started = make_scheduler(db, catch_up=timedelta(hours=3))
+    nominal = msk(2024, 5, 10, 13, 0)
+    now = nominal + timedelta(seconds=5)
+    assert process(scheduler, job, row(nominal), now) == msk(2024, 5, 11, 13, 0)
+    assert started == [nominal]
+    assert db.advanced == [('daily', nominal, msk(2024, 5, 11, 13, 0))]
+
+
+def test_missed_runs_collapse_into_one_catch_up():
+    db = FakeDatabase()
+    scheduler, job, started = make_scheduler(db, catch_up=timedelta(hours=3))
+    nominal = msk(2024, 5, 10, 13, 0)
+    now = nominal + timedelta(hours=2)
+    process(scheduler, job, row(nominal), now)
+    assert started == [nominal]
+
+
+def test_run_older_than_catch_up_is_skipped():
+    db = FakeDatabase()
+    scheduler, job, started = make_scheduler(db, catch_up=timedelta(hours=3))
+    nominal = msk(2024, 5, 10, 13, 0)
+    now = nominal + timedelta(days=2, hours=1)
+    assert process(scheduler, job, row(nominal), now) == msk(2024, 5, 13, 13, 0)
+    assert started == []
+    assert db.advanced[0][2] == msk(2024, 5, 13, 13, 0)
+
+
+def test_run_skipped_while_previous_is_running():
+    db = FakeDatabase()
+    scheduler, job, started = make_scheduler(db)
+    job.running = 1
+    nominal = msk(2024, 5, 10, 13, 0)
+    process(scheduler, job, row(nominal), nominal + timedelta(seconds=5))
+    assert started == [] and len(db.advanced) == 1
+
+
+def test_run_taken_by_another_replica():
+    db = FakeDatabase(advance=False)
+    scheduler, job, started = make_scheduler(db)
+    nominal = msk(2024, 5, 10, 13, 0)
+    assert process(scheduler, job, row(nominal), nominal + timedelta(seconds=5)) is None
+    assert started == []
+
+
+def test_manual_trigger_uses_current_slot():
+    db = FakeDatabase()
+    scheduler, job, started = make_scheduler(db)
+    triggered_at = msk(2024, 5, 10, 18, 42)
+    next_run_at = msk(2024, 5, 11, 13, 0)
+    process(scheduler, job, row(next_run_at, triggered_at), triggered_at + timedelta(seconds=1))
+    assert db.triggers_taken == ['daily']
+    assert started == [msk(2024, 5, 10, 13, 0)]
+
+
+def test_jitter_is_stable_and_bounded():
+    scheduler, job, _ = make_scheduler(FakeDatabase(), jitter=600)
+    nominal = msk(2024, 5, 10, 13, 0)
+    assert Scheduler._jitter(job, nominal) == Scheduler._jitter(job, nominal)
+    assert timedelta(0) <= Scheduler._jitter(job, nominal) <= timedelta(seconds=600)
+    # Запуск не начинается раньше сдвинутого времени
+    db = FakeDatabase()
+    scheduler, job, started = make_scheduler(db, jitter=600)
+    shifted = nominal + Scheduler._jitter(job, nominal)
+    assert process(scheduler, job, row(nominal), shifted - timedelta(microseconds=1)) == shifted
+    assert started == []
+
+
+def test_production_schedules_parse():
+    assert set(bot.scheduler.jobs) == {'daily_broadcast', 'auto_backup', 'reprobe_dead_chats'}